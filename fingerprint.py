@@ -0,0 +1,173 @@
+"""
+Service fingerprints and matching for SubHawk
+
+Kept free of I/O and fully annotated so it can be compiled with mypyc
+(`mypyc fingerprint.py`); the compiled extension is picked up automatically
+in place of this file.
+"""
+
+import re
+from collections import namedtuple
+from typing import Any, Dict, List, Optional, Tuple
+
+# Known vulnerable CNAME patterns and error signatures
+FINGERPRINTS: Dict[str, Dict[str, Any]] = {
+    'AWS/S3': {
+        'cname': ['s3.amazonaws.com', 's3-website'],
+        'http': ['NoSuchBucket', 'The specified bucket does not exist'],
+        'vulnerable': True
+    },
+    'GitHub Pages': {
+        'cname': ['github.io'],
+        'http': ['There isn\'t a GitHub Pages site here', 'For root URLs'],
+        'vulnerable': True
+    },
+    'Heroku': {
+        'cname': ['herokuapp.com', 'herokussl.com'],
+        'http': ['No such app', 'There\'s nothing here', 'herokucdn.com/error-pages'],
+        'vulnerable': True
+    },
+    'Shopify': {
+        'cname': ['myshopify.com'],
+        'http': ['Sorry, this shop is currently unavailable', 'Only one step left'],
+        'vulnerable': True
+    },
+    'Tumblr': {
+        'cname': ['tumblr.com'],
+        'http': ['Whatever you were looking for doesn\'t currently exist', 'There\'s nothing here'],
+        'vulnerable': True
+    },
+    'WordPress': {
+        'cname': ['wordpress.com'],
+        'http': ['Do you want to register'],
+        'vulnerable': True
+    },
+    'Ghost': {
+        'cname': ['ghost.io'],
+        'http': ['The thing you were looking for is no longer here'],
+        'vulnerable': True
+    },
+    'Zendesk': {
+        'cname': ['zendesk.com'],
+        'http': ['Help Center Closed', 'this help center no longer exists'],
+        'vulnerable': True
+    },
+    'Fastly': {
+        'cname': ['fastly.net'],
+        'http': ['Fastly error: unknown domain'],
+        'vulnerable': True
+    },
+    'Pantheon': {
+        'cname': ['pantheonsite.io'],
+        'http': ['404 error unknown site'],
+        'vulnerable': True
+    },
+    'Azure': {
+        'cname': ['azurewebsites.net', 'cloudapp.net', 'cloudapp.azure.com'],
+        'http': ['404 Web Site not found', 'Error 404 - Web app not found'],
+        'vulnerable': True,
+        # Unclaimed Azure resource names are NXDOMAIN, so a dangling CNAME is proof enough
+        'dns_vulnerable': lambda cnames, nxdomain: nxdomain
+    },
+    'Unbounce': {
+        'cname': ['unbouncepages.com'],
+        'http': ['The requested URL was not found on this server'],
+        'vulnerable': True
+    },
+    'Surge.sh': {
+        'cname': ['surge.sh'],
+        'http': ['project not found'],
+        'vulnerable': True
+    },
+    'Bitbucket': {
+        'cname': ['bitbucket.io'],
+        'http': ['Repository not found'],
+        'vulnerable': True
+    },
+    'Netlify': {
+        'cname': ['netlify.com', 'netlify.app'],
+        'http': ['Not Found - Request ID'],
+        'vulnerable': True
+    },
+    'Cargo': {
+        'cname': ['cargocollective.com'],
+        'http': ['404 Not Found'],
+        'vulnerable': True
+    },
+    'Statuspage': {
+        'cname': ['statuspage.io'],
+        'http': ['You are being', 'redirected'],
+        'vulnerable': True
+    },
+    'Uservoice': {
+        'cname': ['uservoice.com'],
+        'http': ['This UserVoice subdomain is currently unavailable'],
+        'vulnerable': True
+    },
+    'Cloudfront': {
+        'cname': ['cloudfront.net'],
+        'http': ['ERROR: The request could not be satisfied', 'Bad request'],
+        'vulnerable': True
+    }
+}
+
+# Frozen view of FINGERPRINTS, built once at import for the per-subdomain hot path
+Fingerprint = namedtuple('Fingerprint', 'service cname_suffixes http_re vulnerable dns_vulnerable')
+
+def _build_fingerprint(service: str, fingerprint: Dict[str, Any]) -> Fingerprint:
+    """Precompile one FINGERPRINTS entry"""
+    # One case-insensitive alternation per service, so a body is scanned once
+    http_re = None
+    if fingerprint['http']:
+        http_re = re.compile('|'.join(re.escape(p) for p in fingerprint['http']), re.IGNORECASE)
+    return Fingerprint(
+        service,
+        tuple(p.lower() for p in fingerprint['cname']),
+        http_re,
+        fingerprint.get('vulnerable', False),
+        fingerprint.get('dns_vulnerable')
+    )
+
+_FPS = tuple(_build_fingerprint(service, fp) for service, fp in FINGERPRINTS.items())
+
+# CNAME patterns are domain suffixes, checked in one C-level str.endswith call.
+# Dotless patterns (e.g. 's3-website') sit mid-hostname and stay substring markers.
+CNAME_SUFFIX_MAP = {
+    pattern: fp for fp in _FPS for pattern in fp.cname_suffixes if '.' in pattern
+}
+CNAME_SUFFIXES = tuple(CNAME_SUFFIX_MAP)
+CNAME_MARKER_MAP = {
+    pattern: fp for fp in _FPS for pattern in fp.cname_suffixes if '.' not in pattern
+}
+
+def match_cname_fingerprint(cname: str) -> Optional[Fingerprint]:
+    """Return the fingerprint a (lowercased) CNAME target points to, or None"""
+    if cname.endswith(CNAME_SUFFIXES):
+        return next(CNAME_SUFFIX_MAP[s] for s in CNAME_SUFFIXES if cname.endswith(s))
+    for marker, fp in CNAME_MARKER_MAP.items():
+        if marker in cname:
+            return fp
+    return None
+
+def check_fingerprint(cnames: List[str], http_response: Optional[str]) -> Tuple[bool, str, str]:
+    """Check if subdomain matches known vulnerable fingerprints"""
+    if not http_response:
+        return False, "", ""
+    
+    for cname in cnames:
+        # If both CNAME and HTTP patterns match, it's likely vulnerable;
+        # only the CNAME's own service patterns need scanning
+        fp = match_cname_fingerprint(cname)
+        if fp and fp.vulnerable and fp.http_re and fp.http_re.search(http_response):
+            return True, fp.service, cname
+    
+    return False, "", ""
+
+def check_dns_fingerprint(cnames: List[str], nxdomain: bool) -> Tuple[bool, str, str]:
+    """Check if the DNS state alone matches a known vulnerable fingerprint"""
+    for cname in cnames:
+        fp = match_cname_fingerprint(cname)
+        if fp and fp.dns_vulnerable and fp.dns_vulnerable(cnames, nxdomain):
+            return True, fp.service, cname
+    
+    return False, "", ""
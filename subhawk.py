@@ -4,18 +4,32 @@ Subdomain Takeover Scanner
 A comprehensive tool for detecting potential subdomain takeover vulnerabilities
 """
 
+import asyncio
+import aiohttp
+import dns.asyncresolver
+import dns.name
+import dns.rdatatype
 import dns.resolver
-import requests
-import concurrent.futures
+import ijson
 import argparse
-import json
+import mmap
+import orjson
+import os
 import re
+import sqlite3
+import stat
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Set, Tuple
 from urllib.parse import urlparse
 import socket
 import time
 from datetime import datetime
 
+from fingerprint import (
+    FINGERPRINTS, check_dns_fingerprint, check_fingerprint, match_cname_fingerprint
+)
+
 # ANSI color codes for terminal output
 class Colors:
     HEADER = '\033[95m'
@@ -28,120 +42,227 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
-# Known vulnerable CNAME patterns and error signatures
-FINGERPRINTS = {
-    'AWS/S3': {
-        'cname': ['s3.amazonaws.com', 's3-website'],
-        'http': ['NoSuchBucket', 'The specified bucket does not exist'],
-        'vulnerable': True
-    },
-    'GitHub Pages': {
-        'cname': ['github.io'],
-        'http': ['There isn\'t a GitHub Pages site here', 'For root URLs'],
-        'vulnerable': True
-    },
-    'Heroku': {
-        'cname': ['herokuapp.com', 'herokussl.com'],
-        'http': ['No such app', 'There\'s nothing here', 'herokucdn.com/error-pages'],
-        'vulnerable': True
-    },
-    'Shopify': {
-        'cname': ['myshopify.com'],
-        'http': ['Sorry, this shop is currently unavailable', 'Only one step left'],
-        'vulnerable': True
-    },
-    'Tumblr': {
-        'cname': ['tumblr.com'],
-        'http': ['Whatever you were looking for doesn\'t currently exist', 'There\'s nothing here'],
-        'vulnerable': True
-    },
-    'WordPress': {
-        'cname': ['wordpress.com'],
-        'http': ['Do you want to register'],
-        'vulnerable': True
-    },
-    'Ghost': {
-        'cname': ['ghost.io'],
-        'http': ['The thing you were looking for is no longer here'],
-        'vulnerable': True
-    },
-    'Zendesk': {
-        'cname': ['zendesk.com'],
-        'http': ['Help Center Closed', 'this help center no longer exists'],
-        'vulnerable': True
-    },
-    'Fastly': {
-        'cname': ['fastly.net'],
-        'http': ['Fastly error: unknown domain'],
-        'vulnerable': True
-    },
-    'Pantheon': {
-        'cname': ['pantheonsite.io'],
-        'http': ['404 error unknown site'],
-        'vulnerable': True
-    },
-    'Azure': {
-        'cname': ['azurewebsites.net', 'cloudapp.net', 'cloudapp.azure.com'],
-        'http': ['404 Web Site not found', 'Error 404 - Web app not found'],
-        'vulnerable': True
-    },
-    'Unbounce': {
-        'cname': ['unbouncepages.com'],
-        'http': ['The requested URL was not found on this server'],
-        'vulnerable': True
-    },
-    'Surge.sh': {
-        'cname': ['surge.sh'],
-        'http': ['project not found'],
-        'vulnerable': True
-    },
-    'Bitbucket': {
-        'cname': ['bitbucket.io'],
-        'http': ['Repository not found'],
-        'vulnerable': True
-    },
-    'Netlify': {
-        'cname': ['netlify.com', 'netlify.app'],
-        'http': ['Not Found - Request ID'],
-        'vulnerable': True
-    },
-    'Cargo': {
-        'cname': ['cargocollective.com'],
-        'http': ['404 Not Found'],
-        'vulnerable': True
-    },
-    'Statuspage': {
-        'cname': ['statuspage.io'],
-        'http': ['You are being', 'redirected'],
-        'vulnerable': True
-    },
-    'Uservoice': {
-        'cname': ['uservoice.com'],
-        'http': ['This UserVoice subdomain is currently unavailable'],
-        'vulnerable': True
-    },
-    'Cloudfront': {
-        'cname': ['cloudfront.net'],
-        'http': ['ERROR: The request could not be satisfied', 'Bad request'],
-        'vulnerable': True
-    }
-}
+class TokenBucket:
+    """Async token bucket capping the query rate sent to one resolver"""
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        # Time of the next free slot; up to one second of unused slots may
+        # accumulate, which is the bucket's burst capacity of `rate` tokens
+        self.next_at = time.monotonic()
+    
+    async def acquire(self):
+        """Reserve the next slot and sleep once until it comes up"""
+        now = time.monotonic()
+        slot = max(self.next_at, now - 1)
+        self.next_at = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+class PersistentCache:
+    """SQLite store of DNS and HTTP results with per-entry expiry
+    
+    A cache failure must never change a scan result, so database errors
+    (e.g. another scan holding the lock) are treated as cache misses.
+    All database work runs on one background thread so the event loop never
+    waits on disk or on a lock, and writes are committed in batches.
+    Concurrent scans sharing cache.db still contend for its write lock and
+    will slow each other's cache lookups down.
+    """
+    # Lookups queue behind a blocked write, so give up on the lock quickly
+    BUSY_TIMEOUT = 0.1
+    # Pending writes per transaction
+    BATCH_SIZE = 500
+    
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A single worker thread serialises access to the one connection
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        # Autocommit outside the explicit batch transactions, so no lock is held between them
+        self.db = sqlite3.connect(path, timeout=self.BUSY_TIMEOUT, isolation_level=None,
+                                  check_same_thread=False)
+        # WAL lets concurrent scans read while one writes; NORMAL sync keeps commits cheap
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute(
+            'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, expires REAL)'
+        )
+        # key -> (value, expires), written out BATCH_SIZE entries at a time
+        self.pending = {}
+    
+    async def get(self, key: str):
+        """Return (value, seconds left) for a fresh entry, or None"""
+        loop = asyncio.get_running_loop()
+        row = self.pending.get(key)
+        if not row:
+            row = await loop.run_in_executor(self.executor, self._select, key)
+        if row:
+            remaining = row[1] - time.time()
+            if remaining > 0:
+                return orjson.loads(row[0]), remaining
+        return None
+    
+    def set(self, key: str, value, ttl: float):
+        """Store a JSON-serialisable value for ttl seconds"""
+        self.pending[key] = (orjson.dumps(value), time.time() + ttl)
+        if len(self.pending) >= self.BATCH_SIZE:
+            self.flush()
+    
+    def flush(self):
+        """Hand the pending writes to the database thread"""
+        if self.pending:
+            batch, self.pending = self.pending, {}
+            self.executor.submit(self._insert, batch)
+    
+    async def close(self):
+        """Write out pending entries, drop expired ones and close the database"""
+        self.flush()
+        await asyncio.get_running_loop().run_in_executor(self.executor, self._close)
+        self.executor.shutdown()
+    
+    def _select(self, key: str):
+        """Fetch (value, expires) for key; runs on the database thread"""
+        try:
+            return self.db.execute(
+                'SELECT value, expires FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+    
+    def _insert(self, batch: Dict[str, Tuple[bytes, float]]):
+        """Write a batch in one transaction; runs on the database thread"""
+        try:
+            self.db.execute('BEGIN')
+            self.db.executemany(
+                'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                [(key, value, expires) for key, (value, expires) in batch.items()]
+            )
+            self.db.execute('COMMIT')
+        except sqlite3.Error:
+            # Losing a batch only costs a re-query on the next scan
+            if self.db.in_transaction:
+                self.db.execute('ROLLBACK')
+    
+    def _close(self):
+        """Drop expired entries and close; runs on the database thread"""
+        try:
+            self.db.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),))
+        except sqlite3.Error:
+            pass
+        self.db.close()
+
+# DNS answer cache: NXDOMAIN/NoAnswer are kept only briefly so a name that
+# comes alive mid-scan is not masked for the resolver's full negative TTL
+DNS_NEGATIVE_TTL = 30
+DNS_CACHE_SIZE = 100000
+
+# Public resolvers start dropping answers around 500 qps per client IP
+RESOLVER_QPS = 400
+# Results persisted between scans, so re-runs only query what has expired
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.subhawk', 'cache.db')
+HTTP_CACHE_TTL = 3600
+
+# Every known error signature sits within the first few KB of the page
+HTTP_BODY_LIMIT = 8192
+
+# Ceiling on lookups in flight across the whole scan; each one holds a UDP socket
+MAX_DNS_IN_FLIGHT = 2000
+
+# Passive sources, each parsed incrementally so large answers are never buffered
+async def _parse_crtsh(response: aiohttp.ClientResponse):
+    async for name_value in ijson.items_async(response.content, 'item.name_value'):
+        # crt.sh may return multiple domains separated by newlines
+        for name in name_value.split('\n'):
+            yield name
+
+async def _parse_certspotter(response: aiohttp.ClientResponse):
+    async for name in ijson.items_async(response.content, 'item.dns_names.item'):
+        yield name
+
+async def _parse_alienvault(response: aiohttp.ClientResponse):
+    async for name in ijson.items_async(response.content, 'passive_dns.item.hostname'):
+        yield name
+
+async def _parse_hackertarget(response: aiohttp.ClientResponse):
+    # Plain text, one "host,ip" pair per line
+    async for line in response.content:
+        yield line.decode('utf-8', 'ignore').split(',')[0]
+
+PASSIVE_SOURCES = [
+    ('crt.sh', 'https://crt.sh/?q=%.{domain}&output=json', _parse_crtsh),
+    ('CertSpotter',
+     'https://api.certspotter.com/v1/issuances?domain={domain}&include_subdomains=true&expand=dns_names',
+     _parse_certspotter),
+    ('AlienVault OTX',
+     'https://otx.alienvault.com/api/v1/indicators/domain/{domain}/passive_dns',
+     _parse_alienvault),
+    ('HackerTarget', 'https://api.hackertarget.com/hostsearch/?q={domain}', _parse_hackertarget),
+]
 
 class SubdomainTakeoverScanner:
     def __init__(self, domain: str, wordlist: str = None, threads: int = 10, 
-                 timeout: int = 5, verbose: bool = False, output: str = None):
+                 timeout: int = 5, verbose: bool = False, output: str = None,
+                 resolvers: str = None, cache: bool = True, low_memory: bool = False):
         self.domain = domain
         self.wordlist = wordlist
         self.threads = threads
         self.timeout = timeout
         self.verbose = verbose
         self.output = output
+        self.subdomain_count = 0
         self.subdomains = set()
+        self._seen = self.subdomains
+        if low_memory and output:
+            self.log("--low-memory has no effect with -o; every name is kept for the report", "WARNING")
+        elif low_memory:
+            # Opt-in: a Bloom filter (~10 bits per name) instead of a set of strings,
+            # at the cost of skipping about 0.1% of unique names as false positives
+            from pybloom_live import ScalableBloomFilter
+            self._seen = ScalableBloomFilter(initial_capacity=1_000_000, error_rate=0.001)
+        # Takeover pipeline input, set while check_takeovers() is running
+        self._dns_q = None
         self.vulnerable_subdomains = []
-        self.resolver = dns.resolver.Resolver()
-        self.resolver.timeout = timeout
-        self.resolver.lifetime = timeout
+        self.resolvers = self.build_resolvers(resolvers)
+        self.limiters = [TokenBucket(RESOLVER_QPS) for _ in self.resolvers]
+        # DNS lookups are cheap, so run far more of them at once than threads,
+        # and enough that every resolver in the pool can reach its rate limit.
+        # The wordlist and takeover stages each run this many workers at the
+        # same time, so each gets half of the scan-wide ceiling.
+        self.concurrency = min(max(threads * 50, len(self.resolvers) * RESOLVER_QPS),
+                               MAX_DNS_IN_FLIGHT // 2)
+        # (name, rdtype) -> (expiry, records, nxdomain), oldest entries evicted first
+        self._dns_cache: Dict[Tuple[str, str], Tuple[float, List[str], bool]] = OrderedDict()
+        self.cache = None
+        if cache:
+            try:
+                self.cache = PersistentCache(CACHE_PATH)
+            except (OSError, sqlite3.Error) as e:
+                self.log(f"Result cache disabled: {str(e)}", "WARNING")
+        
+    def build_resolvers(self, resolvers_file: str = None) -> List[dns.asyncresolver.Resolver]:
+        """Build one resolver per nameserver IP, or the system resolver if none given"""
+        ips = []
+        if resolvers_file:
+            try:
+                with open(resolvers_file, 'r') as f:
+                    ips = [line.strip() for line in f
+                           if line.strip() and not line.startswith('#')]
+            except FileNotFoundError:
+                self.log(f"Resolvers file not found: {resolvers_file}", "ERROR")
+        
+        if ips:
+            resolvers = []
+            for ip in ips:
+                resolver = dns.asyncresolver.Resolver(configure=False)
+                resolver.nameservers = [ip]
+                resolvers.append(resolver)
+        else:
+            resolvers = [dns.asyncresolver.Resolver()]
         
+        for resolver in resolvers:
+            resolver.timeout = self.timeout
+            resolver.lifetime = self.timeout
+        return resolvers
+    
     def print_banner(self):
         """Print tool banner"""
         ascii_art = f"""{Colors.FAIL}
@@ -166,6 +287,7 @@ class SubdomainTakeoverScanner:
 {Colors.OKCYAN}Target Domain:{Colors.ENDC} {self.domain}
 {Colors.OKCYAN}Threads:{Colors.ENDC} {self.threads}
 {Colors.OKCYAN}Timeout:{Colors.ENDC} {self.timeout}s
+{Colors.OKCYAN}Resolvers:{Colors.ENDC} {len(self.resolvers)}
 {Colors.OKCYAN}Started:{Colors.ENDC} {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 """
         print(banner)
@@ -183,102 +305,260 @@ class SubdomainTakeoverScanner:
         timestamp = datetime.now().strftime('%H:%M:%S')
         print(f"{color}[{timestamp}] [{level}]{Colors.ENDC} {message}")
     
-    def enumerate_subdomains_passive(self) -> Set[str]:
-        """Enumerate subdomains using passive techniques"""
-        self.log("Starting passive subdomain enumeration...")
-        subdomains = set()
-        
-        # Try certificate transparency logs
+    def add_subdomain(self, subdomain: str) -> bool:
+        """Queue a newly discovered subdomain for takeover checks; False if already seen"""
+        if subdomain in self._seen:
+            return False
+        self._seen.add(subdomain)
+        self.subdomain_count += 1
+        # Never waits, so a passive source's socket is not stalled behind DNS
+        self._dns_q.put_nowait(subdomain)
+        return True
+    
+    async def query_passive_source(self, session: aiohttp.ClientSession,
+                                   source: str, url: str, parse) -> int:
+        """Collect subdomains from a single passive source"""
+        found = 0
         try:
-            url = f"https://crt.sh/?q=%.{self.domain}&output=json"
-            response = requests.get(url, timeout=self.timeout)
-            if response.status_code == 200:
-                data = response.json()
-                for entry in data:
-                    name_value = entry.get('name_value', '')
-                    # Split by newlines as crt.sh may return multiple domains
-                    for subdomain in name_value.split('\n'):
+            async with session.get(url.format(domain=self.domain)) as response:
+                if response.status == 200:
+                    async for subdomain in parse(response):
                         subdomain = subdomain.strip().lower()
                         if subdomain.endswith(self.domain) and '*' not in subdomain:
-                            subdomains.add(subdomain)
-                self.log(f"Found {len(subdomains)} subdomains from crt.sh", "SUCCESS")
+                            found += self.add_subdomain(subdomain)
+                    self.log(f"Found {found} new subdomains from {source}", "SUCCESS")
         except Exception as e:
             if self.verbose:
-                self.log(f"crt.sh enumeration failed: {str(e)}", "WARNING")
+                self.log(f"{source} enumeration failed: {str(e)}", "WARNING")
         
-        return subdomains
+        return found
     
-    def enumerate_subdomains_wordlist(self) -> Set[str]:
+    async def enumerate_subdomains_passive(self) -> int:
+        """Enumerate subdomains using passive techniques"""
+        self.log("Starting passive subdomain enumeration...")
+        
+        # Sources are independent, so query them all at once; the timeout
+        # applies per read so long streamed answers are not cut off
+        timeout = aiohttp.ClientTimeout(sock_connect=self.timeout, sock_read=self.timeout)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            results = await asyncio.gather(*[
+                self.query_passive_source(session, source, url, parse)
+                for source, url, parse in PASSIVE_SOURCES
+            ])
+        
+        return sum(results)
+    
+    async def enumerate_subdomains_wordlist(self) -> int:
         """Enumerate subdomains using wordlist"""
         if not self.wordlist:
-            return set()
+            return 0
         
         self.log(f"Starting wordlist-based enumeration from {self.wordlist}...")
-        subdomains = set()
+        found = 0
+        # Bounded so huge wordlists are fed lazily rather than queued up front
+        word_q = asyncio.Queue(maxsize=1000)
         
-        try:
-            with open(self.wordlist, 'r') as f:
-                words = [line.strip() for line in f if line.strip()]
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=self.threads) as executor:
-                future_to_word = {
-                    executor.submit(self.check_subdomain_exists, f"{word}.{self.domain}"): word 
-                    for word in words
-                }
-                
-                for future in concurrent.futures.as_completed(future_to_word):
-                    subdomain = future.result()
-                    if subdomain:
-                        subdomains.add(subdomain)
+        async def worker():
+            nonlocal found
+            while True:
+                subdomain = await word_q.get()
+                try:
+                    if await self.check_subdomain_exists(subdomain) and \
+                            self.add_subdomain(subdomain):
+                        found += 1
                         if self.verbose:
                             self.log(f"Found: {subdomain}", "SUCCESS")
+                finally:
+                    word_q.task_done()
+        
+        try:
+            with open(self.wordlist, 'rb') as f:
+                workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+                try:
+                    suffix = f".{self.domain}"
+                    for line in self._wordlist_lines(f):
+                        word = line.strip()
+                        if word:
+                            subdomain = word.decode('utf-8', 'ignore').lower() + suffix
+                            # Names already found passively need no lookup
+                            if subdomain not in self._seen:
+                                await word_q.put(subdomain)
+                    await word_q.join()
+                finally:
+                    for w in workers:
+                        w.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
             
-            self.log(f"Found {len(subdomains)} subdomains from wordlist", "SUCCESS")
+            self.log(f"Found {found} new subdomains from wordlist", "SUCCESS")
         except FileNotFoundError:
             self.log(f"Wordlist file not found: {self.wordlist}", "ERROR")
         except Exception as e:
             self.log(f"Wordlist enumeration failed: {str(e)}", "ERROR")
         
-        return subdomains
+        return found
+    
+    def _wordlist_lines(self, f):
+        """Yield raw wordlist lines, via mmap for regular files"""
+        st = os.fstat(f.fileno())
+        # mmap refuses empty files, pipes and FIFOs (e.g. -w <(cmd))
+        if stat.S_ISREG(st.st_mode) and st.st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield from iter(mm.readline, b'')
+        else:
+            yield from f
+    
+    def _cache_dns(self, name: str, rdtype: str, records: List[str], ttl: float,
+                   persist: bool = True, nxdomain: bool = False):
+        """Store a DNS answer until its TTL runs out"""
+        key = (name, rdtype)
+        self._dns_cache[key] = (time.monotonic() + ttl, records, nxdomain)
+        self._dns_cache.move_to_end(key)
+        if len(self._dns_cache) > DNS_CACHE_SIZE:
+            self._dns_cache.popitem(last=False)
+        if persist and self.cache:
+            self.cache.set(f"{rdtype}:{name}", records, ttl)
     
-    def check_subdomain_exists(self, subdomain: str) -> str:
+    async def _resolve(self, name: str, rdtype: str) -> List[str]:
+        """Resolve a record type, answering from the cache when still fresh"""
+        records, _ = await self._lookup(name, rdtype)
+        return records
+    
+    async def _lookup(self, name: str, rdtype: str) -> Tuple[List[str], bool]:
+        """Like _resolve, but also report whether a CNAME chain dangles
+        
+        The flag is set only when NXDOMAIN was reached by following a CNAME
+        away from the queried name. An empty record list alone cannot tell a
+        missing target apart from one without records of this type (NODATA).
+        An NXDOMAIN for the name itself, such as a deleted record, does not count.
+        """
+        name = name.lower()
+        key = (name, rdtype)
+        cached = self._dns_cache.get(key)
+        if cached:
+            expiry, records, nxdomain = cached
+            if expiry > time.monotonic():
+                self._dns_cache.move_to_end(key)
+                return records, nxdomain
+            del self._dns_cache[key]
+        
+        # Answers from an earlier scan that are still within their TTL
+        if self.cache:
+            stored = await self.cache.get(f"{rdtype}:{name}")
+            if stored:
+                records, remaining = stored
+                self._cache_dns(name, rdtype, records, remaining, persist=False)
+                return records, False
+        
+        # Same name always goes to the same resolver, each held under its rate limit
+        index = hash(name) % len(self.resolvers)
+        await self.limiters[index].acquire()
+        try:
+            # dnspython's own lifetime does not always fire under heavy load,
+            # so enforce the deadline from outside; a timeout is never cached
+            answers = await asyncio.wait_for(
+                self.resolvers[index].resolve(name, rdtype), self.timeout
+            )
+        except dns.resolver.NXDOMAIN as exc:
+            try:
+                dangling = exc.canonical_name != dns.name.from_text(name)
+            except Exception:
+                dangling = False
+            # Negative answers expire long before any re-scan, so they stay in memory
+            self._cache_dns(name, rdtype, [], DNS_NEGATIVE_TTL, persist=False, nxdomain=dangling)
+            return [], dangling
+        except dns.resolver.NoAnswer:
+            self._cache_dns(name, rdtype, [], DNS_NEGATIVE_TTL, persist=False)
+            return [], False
+        
+        # DNS names are case-insensitive; lowercase once here rather than per match
+        records = [rdata.to_text().rstrip('.').lower() for rdata in answers]
+        self._cache_dns(name, rdtype, records, answers.rrset.ttl)
+        
+        # An A answer also settles the CNAME question for the same name:
+        # either the chain starts with its CNAME, or the name has none
+        if rdtype == 'A':
+            cnames = [
+                rrset for rrset in answers.response.answer
+                if rrset.rdtype == dns.rdatatype.CNAME and rrset.name == answers.qname
+            ]
+            if cnames:
+                self._cache_dns(name, 'CNAME',
+                                [rdata.to_text().rstrip('.').lower() for rdata in cnames[0]],
+                                cnames[0].ttl)
+            else:
+                self._cache_dns(name, 'CNAME', [], DNS_NEGATIVE_TTL, persist=False)
+        
+        return records, False
+    
+    async def check_subdomain_exists(self, subdomain: str) -> str:
         """Check if a subdomain exists via DNS resolution"""
         try:
-            answers = self.resolver.resolve(subdomain, 'A')
+            answers = await self._resolve(subdomain, 'A')
             return subdomain if answers else None
-        except:
+        except Exception:
             return None
     
-    def get_cname_records(self, subdomain: str) -> List[str]:
+    async def get_cname_records(self, subdomain: str) -> List[str]:
         """Get CNAME records for a subdomain"""
         cnames = []
         try:
-            answers = self.resolver.resolve(subdomain, 'CNAME')
-            for rdata in answers:
-                cnames.append(str(rdata.target).rstrip('.'))
-        except dns.resolver.NoAnswer:
-            pass
-        except dns.resolver.NXDOMAIN:
-            pass
+            cnames = await self._resolve(subdomain, 'CNAME')
         except Exception as e:
             if self.verbose:
                 self.log(f"CNAME lookup failed for {subdomain}: {str(e)}", "WARNING")
         
         return cnames
     
-    def get_http_response(self, subdomain: str) -> Tuple[int, str]:
+    def create_session(self) -> aiohttp.ClientSession:
+        """Create the HTTP session shared by every probe in a scan"""
+        # Connections are pooled per origin and each subdomain is probed once,
+        # so idle keep-alive sockets would never be reused; close them right
+        # away instead of holding thousands of file descriptors open
+        connector = aiohttp.TCPConnector(
+            resolver=aiohttp.AsyncResolver(),
+            ttl_dns_cache=300,
+            limit=self.threads * 20,
+            force_close=True,
+            enable_cleanup_closed=True,
+            ssl=False
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+    
+    async def get_http_response(self, subdomain: str,
+                                session: aiohttp.ClientSession) -> Tuple[int, str]:
         """Get HTTP response from subdomain"""
+        cache_key = f"HTTP:{subdomain}"
+        if self.cache:
+            stored = await self.cache.get(cache_key)
+            if stored:
+                status_code, body = stored[0]
+                return status_code, body
+        
         for protocol in ['https', 'http']:
             try:
                 url = f"{protocol}://{subdomain}"
-                response = requests.get(
-                    url, 
-                    timeout=self.timeout, 
-                    allow_redirects=True,
-                    verify=False
-                )
-                return response.status_code, response.text
-            except requests.exceptions.SSLError:
+                # Only the start of the body is fingerprinted, and the page served
+                # at the subdomain itself is the one that matters, not a redirect target
+                async with session.get(
+                    url,
+                    allow_redirects=False,
+                    headers={'Range': f'bytes=0-{HTTP_BODY_LIMIT - 1}'}
+                ) as response:
+                    # Many error pages ignore Range, so stop reading at the limit anyway
+                    body = b''
+                    while len(body) < HTTP_BODY_LIMIT:
+                        chunk = await response.content.read(HTTP_BODY_LIMIT - len(body))
+                        if not chunk:
+                            break
+                        body += chunk
+                    text = body.decode('utf-8', errors='replace')
+                    if self.cache:
+                        self.cache.set(cache_key, [response.status, text], HTTP_CACHE_TTL)
+                    return response.status, text
+            except aiohttp.ClientSSLError:
                 # Try HTTP if HTTPS fails
                 continue
             except Exception as e:
@@ -289,34 +569,15 @@ class SubdomainTakeoverScanner:
     
     def check_fingerprint(self, cnames: List[str], http_response: str) -> Tuple[bool, str, str]:
         """Check if subdomain matches known vulnerable fingerprints"""
-        for service, fingerprint in FINGERPRINTS.items():
-            # Check CNAME patterns
-            cname_match = False
-            matched_cname = ""
-            for cname in cnames:
-                for pattern in fingerprint['cname']:
-                    if pattern in cname.lower():
-                        cname_match = True
-                        matched_cname = cname
-                        break
-                if cname_match:
-                    break
-            
-            # Check HTTP response patterns
-            http_match = False
-            if http_response and fingerprint.get('vulnerable'):
-                for pattern in fingerprint['http']:
-                    if pattern.lower() in http_response.lower():
-                        http_match = True
-                        break
-            
-            # If both CNAME and HTTP patterns match, it's likely vulnerable
-            if cname_match and http_match:
-                return True, service, matched_cname
-        
-        return False, "", ""
+        return check_fingerprint(cnames, http_response)
     
-    def check_subdomain_takeover(self, subdomain: str) -> Dict:
+    def check_dns_fingerprint(self, cnames: List[str], nxdomain: bool) -> Tuple[bool, str, str]:
+        """Check if the DNS state alone matches a known vulnerable fingerprint"""
+        return check_dns_fingerprint(cnames, nxdomain)
+    
+    async def check_subdomain_takeover(self, subdomain: str,
+                                       session: aiohttp.ClientSession,
+                                       cnames: List[str] = None) -> Dict:
         """Check if a subdomain is vulnerable to takeover"""
         result = {
             'subdomain': subdomain,
@@ -326,24 +587,44 @@ class SubdomainTakeoverScanner:
             'evidence': []
         }
         
-        # Get CNAME records
-        cnames = self.get_cname_records(subdomain)
+        # Get CNAME records, unless the DNS stage already resolved them
+        if cnames is None:
+            cnames = await self.get_cname_records(subdomain)
         result['cname'] = cnames
         
-        if not cnames:
+        # A takeover needs the CNAME to point at a tracked service; skip HTTP otherwise
+        fingerprints = {match_cname_fingerprint(cname) for cname in cnames} - {None}
+        if not fingerprints:
             return result
         
-        # Get HTTP response
-        status_code, http_response = self.get_http_response(subdomain)
+        # Some services can be judged from DNS alone, saving the HTTP round trip
+        vulnerable = dns_only = False
+        if any(fp.dns_vulnerable for fp in fingerprints):
+            try:
+                # Only NXDOMAIN reached through the live CNAME counts; a target with
+                # no A record (NODATA) still exists, and a deleted name has no chain
+                _, nxdomain = await self._lookup(subdomain, 'A')
+            except Exception:
+                # Timeouts and SERVFAIL are inconclusive; leave it to HTTP
+                nxdomain = False
+            vulnerable, service, matched_cname = self.check_dns_fingerprint(cnames, nxdomain)
+            dns_only = vulnerable
         
-        # Check fingerprints
-        vulnerable, service, matched_cname = self.check_fingerprint(cnames, http_response)
+        status_code = None
+        if not vulnerable:
+            # Get HTTP response
+            status_code, http_response = await self.get_http_response(subdomain, session)
+            
+            # Check fingerprints
+            vulnerable, service, matched_cname = self.check_fingerprint(cnames, http_response)
         
         if vulnerable:
             result['vulnerable'] = True
             result['service'] = service
             result['evidence'].append(f"CNAME points to: {matched_cname}")
             result['evidence'].append(f"Service identified: {service}")
+            if dns_only:
+                result['evidence'].append("CNAME target does not resolve")
             if status_code:
                 result['evidence'].append(f"HTTP Status: {status_code}")
             
@@ -354,41 +635,80 @@ class SubdomainTakeoverScanner:
         
         return result
     
-    def scan(self):
-        """Main scanning function"""
-        self.print_banner()
+    async def check_takeovers(self, enumeration, session: aiohttp.ClientSession):
+        """Run the takeover checks as a two-stage DNS -> HTTP pipeline
+        
+        The enumeration coroutine feeds the pipeline through add_subdomain(),
+        so checks start while subdomains are still being discovered.
+        """
+        # Separate worker pools let HTTP probes run while slow lookups are still pending
+        # Unbounded: each distinct name is queued at most once, and a full
+        # queue would stall passive downloads until their sock_read timeout
+        dns_q = self._dns_q = asyncio.Queue()
+        http_q = asyncio.Queue(maxsize=1000)
+        
+        async def dns_worker():
+            while True:
+                subdomain = await dns_q.get()
+                try:
+                    cnames = await self.get_cname_records(subdomain)
+                    if any(match_cname_fingerprint(cname) for cname in cnames):
+                        await http_q.put((subdomain, cnames))
+                finally:
+                    dns_q.task_done()
+        
+        async def http_worker():
+            while True:
+                subdomain, cnames = await http_q.get()
+                try:
+                    result = await self.check_subdomain_takeover(subdomain, session, cnames)
+                    if result['vulnerable']:
+                        self.vulnerable_subdomains.append(result)
+                except Exception as e:
+                    if self.verbose:
+                        self.log(f"Takeover check failed for {subdomain}: {str(e)}", "WARNING")
+                finally:
+                    http_q.task_done()
         
-        # Enumerate subdomains
-        self.log("Enumerating subdomains...")
+        workers = [asyncio.create_task(dns_worker()) for _ in range(self.concurrency)]
+        workers += [asyncio.create_task(http_worker()) for _ in range(self.threads * 20)]
         
-        # Passive enumeration
-        passive_subs = self.enumerate_subdomains_passive()
-        self.subdomains.update(passive_subs)
+        await enumeration
         
-        # Wordlist enumeration
+        # Every DNS result is queued for HTTP before dns_q drains
+        await dns_q.join()
+        await http_q.join()
+        
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._dns_q = None
+    
+    async def enumerate_subdomains(self):
+        """Run every enumeration technique, passive first"""
+        await self.enumerate_subdomains_passive()
         if self.wordlist:
-            wordlist_subs = self.enumerate_subdomains_wordlist()
-            self.subdomains.update(wordlist_subs)
+            await self.enumerate_subdomains_wordlist()
+    
+    async def scan(self):
+        """Main scanning function"""
+        self.print_banner()
         
-        if not self.subdomains:
-            self.log("No subdomains found. Try using a wordlist with -w option.", "WARNING")
-            return
+        # Enumerate subdomains, checking each for takeover as it is found
+        self.log("Enumerating subdomains and checking for takeover vulnerabilities...")
         
-        self.log(f"Total unique subdomains found: {len(self.subdomains)}", "INFO")
+        try:
+            async with self.create_session() as session:
+                await self.check_takeovers(self.enumerate_subdomains(), session)
+        finally:
+            if self.cache:
+                await self.cache.close()
         
-        # Check for takeover vulnerabilities
-        self.log("Checking for subdomain takeover vulnerabilities...")
+        if not self.subdomain_count:
+            self.log("No subdomains found. Try using a wordlist with -w option.", "WARNING")
+            return
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.threads) as executor:
-            futures = {
-                executor.submit(self.check_subdomain_takeover, sub): sub 
-                for sub in self.subdomains
-            }
-            
-            for future in concurrent.futures.as_completed(futures):
-                result = future.result()
-                if result['vulnerable']:
-                    self.vulnerable_subdomains.append(result)
+        self.log(f"Total unique subdomains found: {self.subdomain_count}", "INFO")
         
         # Print summary
         self.print_summary()
@@ -403,7 +723,7 @@ class SubdomainTakeoverScanner:
         print(f"{Colors.HEADER}{Colors.BOLD}SCAN SUMMARY{Colors.ENDC}")
         print(f"{Colors.BOLD}{'='*60}{Colors.ENDC}\n")
         
-        print(f"{Colors.OKCYAN}Total Subdomains Scanned:{Colors.ENDC} {len(self.subdomains)}")
+        print(f"{Colors.OKCYAN}Total Subdomains Scanned:{Colors.ENDC} {self.subdomain_count}")
         print(f"{Colors.FAIL}{Colors.BOLD}Vulnerable Subdomains:{Colors.ENDC} {len(self.vulnerable_subdomains)}\n")
         
         if self.vulnerable_subdomains:
@@ -425,20 +745,36 @@ class SubdomainTakeoverScanner:
                 'scan_info': {
                     'domain': self.domain,
                     'timestamp': datetime.now().isoformat(),
-                    'total_subdomains': len(self.subdomains),
+                    'total_subdomains': self.subdomain_count,
                     'vulnerable_count': len(self.vulnerable_subdomains)
                 },
                 'subdomains': list(self.subdomains),
                 'vulnerable': self.vulnerable_subdomains
             }
             
-            with open(self.output, 'w') as f:
-                json.dump(results, f, indent=2)
+            with open(self.output, 'wb') as f:
+                f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
             
             self.log(f"Results saved to {self.output}", "SUCCESS")
         except Exception as e:
             self.log(f"Failed to save results: {str(e)}", "ERROR")
 
+def raise_fd_limit():
+    """Lift the soft open-file limit so in-flight queries don't run into EMFILE"""
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return
+    
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = 65536 if hard == resource.RLIM_INFINITY else min(hard, 65536)
+    if soft != resource.RLIM_INFINITY and soft < target:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        except (ValueError, OSError):
+            pass
+
 def main():
     parser = argparse.ArgumentParser(
         description='Subdomain Takeover Scanner - Detect vulnerable subdomain configurations',
@@ -456,6 +792,9 @@ Examples:
   
   # Save results to JSON
   python subdomain_takeover_scanner.py -d example.com -o results.json -v
+  
+  # Spread DNS queries over several resolvers
+  python subdomain_takeover_scanner.py -d example.com -w wordlist.txt --resolvers resolvers.txt
         """
     )
     
@@ -465,12 +804,16 @@ Examples:
     parser.add_argument('--timeout', type=int, default=5, help='Request timeout in seconds (default: 5)')
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
     parser.add_argument('-o', '--output', help='Output file for results (JSON format)')
+    parser.add_argument('--resolvers', help='File with one DNS resolver IP per line (default: system resolver)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignore and do not update the result cache in ~/.subhawk/cache.db')
+    parser.add_argument('--low-memory', action='store_true',
+                        help='Dedupe with a Bloom filter for huge scans; may skip ~0.1%% of subdomains')
     
     args = parser.parse_args()
     
-    # Disable SSL warnings
-    import urllib3
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    # Every DNS query and HTTP probe in flight holds a socket
+    raise_fd_limit()
     
     # Create scanner instance and run
     scanner = SubdomainTakeoverScanner(
@@ -479,11 +822,14 @@ Examples:
         threads=args.threads,
         timeout=args.timeout,
         verbose=args.verbose,
-        output=args.output
+        output=args.output,
+        resolvers=args.resolvers,
+        cache=not args.no_cache,
+        low_memory=args.low_memory
     )
     
     try:
-        scanner.scan()
+        asyncio.run(scanner.scan())
     except KeyboardInterrupt:
         print(f"\n{Colors.WARNING}Scan interrupted by user{Colors.ENDC}")
     except Exception as e: